@@ -257,11 +257,19 @@ class PrinterConfig:
         return {'config': self.status_info}
     # Autosave functions
     def set(self, section, option, value):
-        if not self.autosave.fileconfig.has_section(section):
-            self.autosave.fileconfig.add_section(section)
-        svalue = str(value)
-        self.autosave.fileconfig.set(section, option, svalue)
-        logging.info("save_config: set [%s] %s = %s", section, option, svalue)
+        self.set_many(section, [(option, value)])
+    def set_many(self, section, options):
+        # Set a list of (option, value) pairs in a single section
+        if not options:
+            return
+        fileconfig = self.autosave.fileconfig
+        if not fileconfig.has_section(section):
+            fileconfig.add_section(section)
+        for option, value in options:
+            svalue = str(value)
+            fileconfig.set(section, option, svalue)
+            logging.info("save_config: set [%s] %s = %s",
+                         section, option, svalue)
     def remove_section(self, section):
         self.autosave.fileconfig.remove_section(section)
     def _disallow_include_conflicts(self, regular_data, cfgname, gcode):
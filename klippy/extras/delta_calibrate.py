@@ -3,7 +3,7 @@
 # Copyright (C) 2017-2019  Kevin O'Connor <kevin@koconnor.net>
 #
 # This file may be distributed under the terms of the GNU GPLv3 license.
-import math, logging, collections
+import math, logging, collections, itertools
 import probe, mathutil
 
 # A "stable position" is a 3-tuple containing the number of steps
@@ -15,8 +15,8 @@ import probe, mathutil
 def load_config_stable(config, option):
     spos = config.get(option)
     try:
-        sa, sb, sc = map(float, spos.split(','))
-    except:
+        sa, sb, sc = [float(v) for v in spos.split(',', 2)]
+    except ValueError:
         msg = "Unable to parse stable position '%s'" % (spos,)
         logging.exception(msg)
         raise config.error(msg)
@@ -33,6 +33,10 @@ MeasureAngles = [210., 270., 330., 30., 90., 150.]
 MeasureOuterRadius = 65
 MeasureRidgeRadius = 5. - .5
 
+# The (cos, sin) XY multiplier of each measurement angle
+MeasureXY = tuple((math.cos(math.radians(a)), math.sin(math.radians(a)))
+                  for a in MeasureAngles)
+
 # How much to prefer a distance measurement over a height measurement
 MEASURE_WEIGHT = 0.5
 
@@ -50,9 +54,8 @@ def measurements_to_distances(measured_params, delta_params):
     outer_dists = [
         od - opw
         for od, opw in zip(mp['OUTER_DISTS'], mp['OUTER_PILLAR_WIDTHS']) ]
-    # Convert angles in degrees to an XY multiplier
-    obj_angles = map(math.radians, MeasureAngles)
-    xy_angles = zip(map(math.cos, obj_angles), map(math.sin, obj_angles))
+    # XY multipliers of the measurement angles
+    xy_angles = MeasureXY
     # Calculate stable positions for center measurements
     inner_ridge = MeasureRidgeRadius * scale
     inner_pos = [(ax * inner_ridge, ay * inner_ridge, 0.)
@@ -99,7 +102,7 @@ class DeltaCalibrate:
         self.probe_helper.minimum_points(3)
         # Restore probe stable positions
         self.last_probe_positions = []
-        for i in range(999):
+        for i in itertools.count():
             height = config.getfloat("height%d" % (i,), None)
             if height is None:
                 break
@@ -107,7 +110,7 @@ class DeltaCalibrate:
             self.last_probe_positions.append((height, height_pos))
         # Restore manually entered heights
         self.manual_heights = []
-        for i in range(999):
+        for i in itertools.count():
             height = config.getfloat("manual_height%d" % (i,), None)
             if height is None:
                 break
@@ -117,7 +120,7 @@ class DeltaCalibrate:
         # Restore distance measurements
         self.delta_analyze_entry = {'SCALE': (1.,)}
         self.last_distances = []
-        for i in range(999):
+        for i in itertools.count():
             dist = config.getfloat("distance%d" % (i,), None)
             if dist is None:
                 break
@@ -142,22 +145,24 @@ class DeltaCalibrate:
         # Save probe stable positions
         section = 'delta_calibrate'
         configfile.remove_section(section)
+        options = []
         for i, (z_offset, spos) in enumerate(probe_positions):
-            configfile.set(section, "height%d" % (i,), z_offset)
-            configfile.set(section, "height%d_pos" % (i,),
-                           "%.3f,%.3f,%.3f" % tuple(spos))
+            options.append(("height%d" % (i,), z_offset))
+            options.append(("height%d_pos" % (i,),
+                            "%.3f,%.3f,%.3f" % tuple(spos)))
         # Save manually entered heights
         for i, (z_offset, spos) in enumerate(self.manual_heights):
-            configfile.set(section, "manual_height%d" % (i,), z_offset)
-            configfile.set(section, "manual_height%d_pos" % (i,),
-                           "%.3f,%.3f,%.3f" % tuple(spos))
+            options.append(("manual_height%d" % (i,), z_offset))
+            options.append(("manual_height%d_pos" % (i,),
+                            "%.3f,%.3f,%.3f" % tuple(spos)))
         # Save distance measurements
         for i, (dist, spos1, spos2) in enumerate(distances):
-            configfile.set(section, "distance%d" % (i,), dist)
-            configfile.set(section, "distance%d_pos1" % (i,),
-                           "%.3f,%.3f,%.3f" % tuple(spos1))
-            configfile.set(section, "distance%d_pos2" % (i,),
-                           "%.3f,%.3f,%.3f" % tuple(spos2))
+            options.append(("distance%d" % (i,), dist))
+            options.append(("distance%d_pos1" % (i,),
+                            "%.3f,%.3f,%.3f" % tuple(spos1)))
+            options.append(("distance%d_pos2" % (i,),
+                            "%.3f,%.3f,%.3f" % tuple(spos2)))
+        configfile.set_many(section, options)
     def probe_finalize(self, offsets, positions):
         # Convert positions into (z_offset, stable_position) pairs
         z_offset = offsets[2]
@@ -179,42 +184,58 @@ class DeltaCalibrate:
         z_weight = 1.
         if distances:
             z_weight = len(distances) / (MEASURE_WEIGHT * len(probe_positions))
+        # Unpack the measurements once so the error function only has
+        # to iterate over flat lists of stable positions
+        z_offsets = [z_offset for z_offset, spos in height_positions]
+        height_spos = [spos for z_offset, spos in height_positions]
+        dists = [dist for dist, spos1, spos2 in distances]
+        dist_spos1 = [spos1 for dist, spos1, spos2 in distances]
+        dist_spos2 = [spos2 for dist, spos1, spos2 in distances]
+        all_spos = height_spos + dist_spos1 + dist_spos2
+        count_heights, count_dists = len(height_spos), len(dists)
+        def calc_heights_dists(delta_params):
+            # Calculate all cartesian positions in a single pass
+            positions = delta_params.get_positions_from_stable(all_spos)
+            heights = [pos[2] for pos in positions[:count_heights]]
+            pos1 = positions[count_heights:count_heights+count_dists]
+            pos2 = positions[count_heights+count_dists:]
+            calc_dists = []
+            for (x1, y1, z1), (x2, y2, z2) in zip(pos1, pos2):
+                dx, dy, dz = x1 - x2, y1 - y2, z1 - z2
+                calc_dists.append(math.sqrt(dx*dx + dy*dy + dz*dz))
+            return heights, calc_dists
         # Perform coordinate descent
+        last_delta_params = [orig_delta_params]
         def delta_errorfunc(params):
-            # Build new delta_params for params under test
-            delta_params = orig_delta_params.new_calibration(params)
+            # Build new delta_params for params under test (deriving
+            # it from the previous evaluation allows it to reuse the
+            # geometry of any unchanged parameters)
+            delta_params = last_delta_params[0].new_calibration(params)
+            last_delta_params[0] = delta_params
+            heights, calc_dists = calc_heights_dists(delta_params)
             # Calculate z height errors
             total_error = 0.
-            for z_offset, stable_pos in height_positions:
-                x, y, z = delta_params.get_position_from_stable(stable_pos)
-                total_error += (z - z_offset)**2
+            for z, z_offset in zip(heights, z_offsets):
+                err = z - z_offset
+                total_error += err * err
             total_error *= z_weight
             # Calculate distance errors
-            for dist, stable_pos1, stable_pos2 in distances:
-                x1, y1, z1 = delta_params.get_position_from_stable(stable_pos1)
-                x2, y2, z2 = delta_params.get_position_from_stable(stable_pos2)
-                d = math.sqrt((x1-x2)**2 + (y1-y2)**2 + (z1-z2)**2)
-                total_error += (d - dist)**2
+            for d, dist in zip(calc_dists, dists):
+                err = d - dist
+                total_error += err * err
             return total_error
         new_params = mathutil.background_coordinate_descent(
             self.printer, adj_params, params, delta_errorfunc)
         # Log and report results
         logging.info("Calculated delta_calibrate parameters: %s", new_params)
         new_delta_params = orig_delta_params.new_calibration(new_params)
-        for z_offset, spos in height_positions:
-            logging.info("height orig: %.6f new: %.6f goal: %.6f",
-                         orig_delta_params.get_position_from_stable(spos)[2],
-                         new_delta_params.get_position_from_stable(spos)[2],
-                         z_offset)
-        for dist, spos1, spos2 in distances:
-            x1, y1, z1 = orig_delta_params.get_position_from_stable(spos1)
-            x2, y2, z2 = orig_delta_params.get_position_from_stable(spos2)
-            orig_dist = math.sqrt((x1-x2)**2 + (y1-y2)**2 + (z1-z2)**2)
-            x1, y1, z1 = new_delta_params.get_position_from_stable(spos1)
-            x2, y2, z2 = new_delta_params.get_position_from_stable(spos2)
-            new_dist = math.sqrt((x1-x2)**2 + (y1-y2)**2 + (z1-z2)**2)
-            logging.info("distance orig: %.6f new: %.6f goal: %.6f",
-                         orig_dist, new_dist, dist)
+        orig_heights, orig_dists = calc_heights_dists(orig_delta_params)
+        new_heights, new_dists = calc_heights_dists(new_delta_params)
+        lines = ["height orig: %.6f new: %.6f goal: %.6f" % h
+                 for h in zip(orig_heights, new_heights, z_offsets)]
+        lines += ["distance orig: %.6f new: %.6f goal: %.6f" % d
+                  for d in zip(orig_dists, new_dists, dists)]
+        logging.info("\n".join(lines))
         # Store results for SAVE_CONFIG
         self.save_state(probe_positions, distances, new_delta_params)
         self.gcode.respond_info(
@@ -23,18 +23,15 @@ class Homing:
         return self.changed_axes
     def _fill_coord(self, coord):
         # Fill in any None entries in 'coord' with current toolhead position
-        thcoord = list(self.toolhead.get_position())
-        for i in range(len(coord)):
-            if coord[i] is not None:
-                thcoord[i] = coord[i]
+        # (toolhead.get_position() already returns a new list)
+        thcoord = self.toolhead.get_position()
+        for i, c in enumerate(coord):
+            if c is not None:
+                thcoord[i] = c
         return thcoord
     def set_homed_position(self, pos):
         self.toolhead.set_position(self._fill_coord(pos))
-    def _calc_endstop_rate(self, mcu_endstop, movepos, speed):
-        startpos = self.toolhead.get_position()
-        axes_d = [mp - sp for mp, sp in zip(movepos, startpos)]
-        move_d = math.sqrt(sum([d*d for d in axes_d[:3]]))
-        move_t = move_d / speed
+    def _calc_endstop_rate(self, mcu_endstop, startpos, movepos, move_t):
         max_steps = max([(abs(s.calc_position_from_coord(startpos)
                               - s.calc_position_from_coord(movepos))
                           / s.get_step_dist())
@@ -54,9 +51,14 @@ class Homing:
                          for es, name in endstops for s in es.get_steppers()]
         # Start endstop checking
         print_time = self.toolhead.get_last_move_time()
+        startpos = self.toolhead.get_position()
+        axes_d = [mp - sp for mp, sp in zip(movepos, startpos)]
+        move_d = math.sqrt(sum([d*d for d in axes_d[:3]]))
+        move_t = move_d / speed
         endstop_triggers = []
         for mcu_endstop, name in endstops:
-            rest_time = self._calc_endstop_rate(mcu_endstop, movepos, speed)
+            rest_time = self._calc_endstop_rate(mcu_endstop, startpos,
+                                                movepos, move_t)
             wait = mcu_endstop.home_start(print_time, ENDSTOP_SAMPLE_TIME,
                                           ENDSTOP_SAMPLE_COUNT, rest_time)
             endstop_triggers.append(wait)
@@ -157,20 +157,35 @@ class DeltaKinematics:
 
 # Delta parameter calibration for DELTA_CALIBRATE tool
 class DeltaCalibration:
-    def __init__(self, radius, angles, arms, endstops, stepdists):
+    def __init__(self, radius, angles, arms, endstops, stepdists, prev=None):
         self.radius = radius
         self.angles = angles
         self.arms = arms
         self.endstops = endstops
         self.stepdists = stepdists
-        # Calculate the XY cartesian coordinates of the delta towers
-        radian_angles = [math.radians(a) for a in angles]
-        self.towers = [(math.cos(a) * radius, math.sin(a) * radius)
-                       for a in radian_angles]
+        self.inv_stepdists = [1. / sd for sd in stepdists]
+        # Reuse any geometry from 'prev' that does not depend on a
+        # changed parameter (coordinate descent alters one at a time)
+        same_radius = prev is not None and prev.radius == radius
+        if same_radius and prev.angles == angles:
+            self.towers = prev.towers
+        else:
+            # Calculate the XY cartesian coordinates of the delta towers
+            radian_angles = [math.radians(a) for a in angles]
+            self.towers = [(math.cos(a) * radius, math.sin(a) * radius)
+                           for a in radian_angles]
+        if same_radius and prev.arms == arms:
+            self.arm2 = prev.arm2
+            self.arm_heights = prev.arm_heights
+        else:
+            # Calculate the Z distance between carriage and nozzle when
+            # the nozzle is at the center of the bed
+            self.arm2 = [a**2 for a in arms]
+            radius2 = radius**2
+            self.arm_heights = [math.sqrt(a2 - radius2) for a2 in self.arm2]
         # Calculate the absolute Z height of each tower endstop
-        radius2 = radius**2
-        self.abs_endstops = [e + math.sqrt(a**2 - radius2)
-                             for e, a in zip(endstops, arms)]
+        self.abs_endstops = [e + ah
+                             for e, ah in zip(endstops, self.arm_heights)]
     def coordinate_descent_params(self, is_extended):
         # Determine adjustment parameters (for use with coordinate_descent)
         adj_params = ('radius', 'angle_a', 'angle_b',
@@ -191,22 +206,35 @@ class DeltaCalibration:
         arms = [params['arm_'+a] for a in 'abc']
         endstops = [params['endstop_'+a] for a in 'abc']
         stepdists = [params['stepdist_'+a] for a in 'abc']
-        return DeltaCalibration(radius, angles, arms, endstops, stepdists)
+        return DeltaCalibration(radius, angles, arms, endstops, stepdists,
+                                prev=self)
     def get_position_from_stable(self, stable_position):
         # Return cartesian coordinates for the given stable_position
         sphere_coords = [
             (t[0], t[1], es - sp * sd)
             for sd, t, es, sp in zip(self.stepdists, self.towers,
                                      self.abs_endstops, stable_position) ]
-        return mathutil.trilateration(sphere_coords, [a**2 for a in self.arms])
+        return mathutil.trilateration(sphere_coords, self.arm2)
+    def get_positions_from_stable(self, stable_positions):
+        # Return cartesian coordinates for a list of stable_positions
+        towers = [(t[0], t[1], es, sd)
+                  for t, es, sd in zip(self.towers, self.abs_endstops,
+                                       self.stepdists)]
+        arm2 = self.arm2
+        trilateration = mathutil.trilateration
+        return [trilateration([(tx, ty, es - sp * sd)
+                               for (tx, ty, es, sd), sp in zip(towers, spos)],
+                              arm2)
+                for spos in stable_positions]
     def calc_stable_position(self, coord):
         # Return a stable_position from a cartesian coordinate
-        steppos = [
-            math.sqrt(a**2 - (t[0]-coord[0])**2 - (t[1]-coord[1])**2) + coord[2]
-            for t, a in zip(self.towers, self.arms) ]
-        return [(ep - sp) / sd
-                for sd, ep, sp in zip(self.stepdists,
-                                      self.abs_endstops, steppos)]
+        steppos = []
+        for t, a2 in zip(self.towers, self.arm2):
+            dx, dy = t[0] - coord[0], t[1] - coord[1]
+            steppos.append(math.sqrt(a2 - dx*dx - dy*dy) + coord[2])
+        return [(ep - sp) * inv_sd
+                for inv_sd, ep, sp in zip(self.inv_stepdists,
+                                          self.abs_endstops, steppos)]
     def save_state(self, configfile):
         # Save the current parameters (for use with SAVE_CONFIG)
         configfile.set('printer', 'delta_radius', "%.6f" % (self.radius,))
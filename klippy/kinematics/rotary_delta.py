@@ -137,6 +137,8 @@ class RotaryDeltaCalibration:
         self.lower_arms = lower_arms
         self.endstops = endstops
         self.stepdists = stepdists
+        self.inv_stepdists = [1. / sd for sd in stepdists]
+        self.lower_arm2 = [la**2 for la in lower_arms]
         # Calculate the absolute angle of each endstop
         ffi_main, self.ffi_lib = chelper.get_ffi()
         self.sks = [ffi_main.gc(self.ffi_lib.rotary_delta_stepper_alloc(
@@ -184,21 +186,25 @@ class RotaryDeltaCalibration:
         return (x, y, z)
     def actuator_to_cartesian(self, spos):
         sphere_coords = [self.elbow_coord(i, sp) for i, sp in enumerate(spos)]
-        lower_arm2 = [la**2 for la in self.lower_arms]
-        return mathutil.trilateration(sphere_coords, lower_arm2)
+        return mathutil.trilateration(sphere_coords, self.lower_arm2)
     def get_position_from_stable(self, stable_position):
         # Return cartesian coordinates for the given stable_position
         spos = [ea - sp * sd
                 for ea, sp, sd in zip(self.abs_endstops, stable_position,
                                       self.stepdists)]
         return self.actuator_to_cartesian(spos)
+    def get_positions_from_stable(self, stable_positions):
+        # Return cartesian coordinates for a list of stable_positions
+        get_pos = self.get_position_from_stable
+        return [get_pos(spos) for spos in stable_positions]
     def calc_stable_position(self, coord):
         # Return a stable_position from a cartesian coordinate
         pos = [ self.ffi_lib.itersolve_calc_position_from_coord(
             sk, coord[0], coord[1], coord[2])
                 for sk in self.sks ]
-        return [(ep - sp) / sd
-                for sd, ep, sp in zip(self.stepdists, self.abs_endstops, pos)]
+        return [(ep - sp) * inv_sd
+                for inv_sd, ep, sp in zip(self.inv_stepdists,
+                                          self.abs_endstops, pos)]
     def save_state(self, configfile):
         # Save the current parameters (for use with SAVE_CONFIG)
         configfile.set('printer', 'shoulder_radius', "%.6f"
@@ -90,26 +90,34 @@ def background_coordinate_descent(printer, adj_params, params, error_func):
 # Trilateration finds the intersection of three spheres.  See the
 # wikipedia article for the details of the algorithm.
 def trilateration(sphere_coords, radius2):
-    sphere_coord1, sphere_coord2, sphere_coord3 = sphere_coords
-    s21 = matrix_sub(sphere_coord2, sphere_coord1)
-    s31 = matrix_sub(sphere_coord3, sphere_coord1)
-
-    d = math.sqrt(matrix_magsq(s21))
-    ex = matrix_mul(s21, 1. / d)
-    i = matrix_dot(ex, s31)
-    vect_ey = matrix_sub(s31, matrix_mul(ex, i))
-    ey = matrix_mul(vect_ey, 1. / math.sqrt(matrix_magsq(vect_ey)))
-    ez = matrix_cross(ex, ey)
-    j = matrix_dot(ey, s31)
-
-    x = (radius2[0] - radius2[1] + d**2) / (2. * d)
-    y = (radius2[0] - radius2[2] - x**2 + (x-i)**2 + j**2) / (2. * j)
-    z = -math.sqrt(radius2[0] - x**2 - y**2)
-
-    ex_x = matrix_mul(ex, x)
-    ey_y = matrix_mul(ey, y)
-    ez_z = matrix_mul(ez, z)
-    return matrix_add(sphere_coord1, matrix_add(ex_x, matrix_add(ey_y, ez_z)))
+    # The vector math is written out with scalar locals (instead of
+    # using the matrix helpers below) as this is called many times
+    # during delta calibration.
+    (x1, y1, z1), (x2, y2, z2), (x3, y3, z3) = sphere_coords
+    s21x, s21y, s21z = x2 - x1, y2 - y1, z2 - z1
+    s31x, s31y, s31z = x3 - x1, y3 - y1, z3 - z1
+
+    d = math.sqrt(s21x*s21x + s21y*s21y + s21z*s21z)
+    inv_d = 1. / d
+    exx, exy, exz = s21x * inv_d, s21y * inv_d, s21z * inv_d
+    i = exx * s31x + exy * s31y + exz * s31z
+    vx, vy, vz = s31x - exx * i, s31y - exy * i, s31z - exz * i
+    inv_v = 1. / math.sqrt(vx*vx + vy*vy + vz*vz)
+    eyx, eyy, eyz = vx * inv_v, vy * inv_v, vz * inv_v
+    ezx = exy * eyz - exz * eyy
+    ezy = exz * eyx - exx * eyz
+    ezz = exx * eyy - exy * eyx
+    j = eyx * s31x + eyy * s31y + eyz * s31z
+
+    r1 = radius2[0]
+    x = (r1 - radius2[1] + d*d) / (2. * d)
+    xi = x - i
+    y = (r1 - radius2[2] - x*x + xi*xi + j*j) / (2. * j)
+    z = -math.sqrt(r1 - x*x - y*y)
+
+    return [x1 + (exx * x + (eyx * y + ezx * z)),
+            y1 + (exy * x + (eyy * y + ezy * z)),
+            z1 + (exz * x + (eyz * y + ezz * z))]
 
 
 ######################################################################